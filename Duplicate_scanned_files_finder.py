@@ -1,21 +1,89 @@
 import os
 import hashlib
+import mmap
 import fitz  # PyMuPDF
 from PIL import Image
 import imagehash
-import tempfile
-import shutil
+import numpy as np
 import pdfplumber
 import re
 import unicodedata
 import datetime
+from collections import OrderedDict
+from typing import Optional
+import csv
+import argparse
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Image as RLImage, Spacer, PageBreak
+from reportlab.pdfgen import canvas
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.utils import ImageReader, simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
 import tkinter as tk
 from tkinter import filedialog
 
+# ------------------------------
+# Shared File Scan
+# ------------------------------
+MMAP_THRESHOLD = 128 * 1024  # Below this size a plain read is cheaper than mapping the file
+SCAN_CACHE_SIZE = 256        # Open image PDFs kept for reuse between hashing and reporting
+
+# (path, mtime) -> (doc, data); the oldest entry is closed when the cache is full
+_scan_cache = OrderedDict()
+
+def _read_file(pdf_path: str):
+    with open(pdf_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return f.read()
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+def _release(data, doc=None):
+    # The document is closed first: it parses the buffer in place and holds it until then
+    if doc is not None:
+        doc.close()
+    if isinstance(data, memoryview):
+        mm = data.obj
+        data.release()
+        mm.close()
+
+def _open_one(pdf_path: str, mtime: float):
+    # PyMuPDF parses the buffer in place and keeps it referenced for the document's lifetime.
+    # Keyed on mtime so a file modified between hashing and reporting is re-read.
+    key = (pdf_path, mtime)
+    entry = _scan_cache.get(key)
+    if entry is not None:
+        _scan_cache.move_to_end(key)
+        return entry[0]
+
+    data = _read_file(pdf_path)
+    try:
+        doc = fitz.open(stream=data, filetype="pdf")
+    except Exception:
+        _release(data)
+        raise
+    _scan_cache[key] = (doc, data)
+    if len(_scan_cache) > SCAN_CACHE_SIZE:
+        _, (old_doc, old_data) = _scan_cache.popitem(last=False)
+        _release(old_data, old_doc)
+    return doc
+
+def close_scanned_files():
+    # Closes every cached document and unmaps its file
+    while _scan_cache:
+        _, (doc, data) = _scan_cache.popitem()
+        _release(data, doc)
+
+def hash_file_bytes(pdf_path: str) -> str:
+    # SHA-256 of the raw bytes only; the file is never parsed as a PDF
+    data = _read_file(pdf_path)
+    try:
+        return hashlib.sha256(data).hexdigest()
+    finally:
+        _release(data)
+
+def open_pdf(pdf_path: str) -> fitz.Document:
+    # Only image PDFs (hashing) and thumbnails (reporting) open files with PyMuPDF
+    return _open_one(pdf_path, os.path.getmtime(pdf_path))
+
 # ------------------------------
 # PDF Type Detection
 # ------------------------------
@@ -45,16 +113,23 @@ def text_hash_pdf(pdf_path: str) -> str:
 # ------------------------------
 # Perceptual Hash for Images
 # ------------------------------
-def perceptual_hash_pdf(pdf_path: str) -> imagehash.ImageHash:
+def pixmap_gray(pix: fitz.Pixmap) -> np.ndarray:
+    # BT.601 luma straight from the pixmap buffer, without an intermediate RGB image.
+    # Widened to uint16 first: NumPy 1.x keeps uint8 * scalar in uint8 and would overflow.
+    arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n).astype(np.uint16)
+    gray = (arr[..., 0] * 76 + arr[..., 1] * 150 + arr[..., 2] * 29) >> 8
+    return gray.astype(np.uint8)
+
+def perceptual_hash_pdf(pdf_path: str) -> Optional[int]:
     try:
-        doc = fitz.open(pdf_path)
+        doc = open_pdf(pdf_path)
         if len(doc) == 0:
             return None
         page = doc[0]
         pix = page.get_pixmap(dpi=100)
-        img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
-        img = img.convert("L").resize((256, 256), Image.LANCZOS)
-        return imagehash.phash(img)
+        img = Image.fromarray(pixmap_gray(pix)).resize((256, 256), Image.LANCZOS)
+        # Packed once into a 64-bit int so comparisons are a single XOR + popcount
+        return int(np.packbits(imagehash.phash(img).hash.flatten()).view(np.uint64)[0])
     except Exception as e:
         print(f"Error hashing {pdf_path}: {e}")
         return None
@@ -62,18 +137,44 @@ def perceptual_hash_pdf(pdf_path: str) -> imagehash.ImageHash:
 # ------------------------------
 # Duplicate Detection
 # ------------------------------
-def find_duplicate_pdfs(folder_path, phash_threshold=5):
+def find_duplicate_pdfs(folder_path, phash_threshold=5, use_visual=True):
     pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.pdf')]
     
+    file_hashes = {}
     text_hashes = {}
     image_hashes = {}
     exact_text_duplicates = []
     exact_visual_duplicates = []
     near_visual_duplicates = []
+    binary_duplicates = []
 
     for file in pdf_files:
         full_path = os.path.join(folder_path, file)
+        try:
+            # Raw bytes only; PDFs are parsed below, and only the image ones are kept open
+            digest = hash_file_bytes(full_path)
+        except OSError as e:
+            print(f"Error hashing {full_path}: {e}")
+            continue
+
+        # Binary-only mode: skip text extraction and rendering, byte-identical copies only
+        if not use_visual:
+            if digest in file_hashes:
+                binary_duplicates.append((file, file_hashes[digest][0], 0))
+            else:
+                file_hashes[digest] = (file, None)
+            continue
+
+        # Byte-identical copies are reported against the first file without parsing them
+        if digest in file_hashes:
+            orig_file, is_text = file_hashes[digest]
+            if is_text is not None:
+                target = exact_text_duplicates if is_text else exact_visual_duplicates
+                target.append((file, orig_file, 0))
+            continue
+
         if is_text_pdf(full_path):
+            file_hashes[digest] = (file, True)
             h = text_hash_pdf(full_path)
             if h in text_hashes:
                 exact_text_duplicates.append((file, text_hashes[h], 0))
@@ -81,100 +182,188 @@ def find_duplicate_pdfs(folder_path, phash_threshold=5):
                 text_hashes[h] = file
         else:
             h = perceptual_hash_pdf(full_path)
-            if not h:
+            if h is None:
+                file_hashes[digest] = (file, None)
+                continue
+            file_hashes[digest] = (file, False)
+            orig_file = image_hashes.get(h)
+            if orig_file is not None:
+                exact_visual_duplicates.append((file, orig_file, 0))
                 continue
             found = False
             for ih, orig_file in image_hashes.items():
-                dist = h - ih
-                if dist == 0:
-                    exact_visual_duplicates.append((file, orig_file, dist))
-                    found = True
-                    break
-                elif dist <= phash_threshold:
+                dist = (h ^ ih).bit_count()
+                if dist <= phash_threshold:
                     near_visual_duplicates.append((file, orig_file, dist))
                     found = True
                     break
             if not found:
                 image_hashes[h] = file
 
-    return exact_text_duplicates, exact_visual_duplicates, near_visual_duplicates
+    return exact_text_duplicates, exact_visual_duplicates, near_visual_duplicates, binary_duplicates
 
 # ------------------------------
 # PDF Report Generation
 # ------------------------------
-def generate_pdf_report(folder_path, text_dups, exact_visual, near_visual, save_path, thumbnail=True):
-    tempdir = tempfile.mkdtemp(prefix="pdf_thumbs_")
-    doc = SimpleDocTemplate(save_path, pagesize=A4)
-    elements = []
-    styles = getSampleStyleSheet()
-
-    title_style = styles['Title']
-    heading_style = styles['Heading2']
-    normal_style = styles['Normal']
-    cell_style = ParagraphStyle('cell', fontSize=9, leading=11)
-
-    elements.append(Paragraph("PDF Duplicates Report", title_style))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph(f"Folder scanned: {folder_path}", normal_style))
-    elements.append(Paragraph(f"Total exact text duplicates: {len(text_dups)}", heading_style))
-    elements.append(Paragraph(f"Total exact visual duplicates: {len(exact_visual)}", heading_style))
-    elements.append(Paragraph(f"Total near-duplicate visual PDFs: {len(near_visual)}", heading_style))
-    elements.append(Spacer(1, 24))
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 40
+COL_WIDTHS = [150, 150, 60, 100]
+CELL_FONT_SIZE = 9
+CELL_LEADING = 11
+CELL_PADDING = 4
+THUMB_SIZE = (80, 100)
+
+def render_thumbnail(pdf_path: str) -> Image.Image:
+    page = open_pdf(pdf_path)[0]
+    pix = page.get_pixmap(dpi=50)
+    img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    img.thumbnail(THUMB_SIZE)
+    return img
+
+def wrap_cell(text: str, width: float) -> list:
+    # simpleSplit only breaks at spaces; a token wider than the cell (e.g. a long
+    # underscore-joined filename) is broken by character so it stays inside its column
+    lines = []
+    for line in simpleSplit(text, "Helvetica", CELL_FONT_SIZE, width):
+        while stringWidth(line, "Helvetica", CELL_FONT_SIZE) > width and len(line) > 1:
+            cut = 1
+            while cut < len(line) and stringWidth(line[:cut + 1], "Helvetica", CELL_FONT_SIZE) <= width:
+                cut += 1
+            lines.append(line[:cut])
+            line = line[cut:]
+        lines.append(line)
+    return lines
+
+def generate_pdf_report(folder_path, text_dups, exact_visual, near_visual, binary_dups, save_path, thumbnail=True):
+    # Drawn straight onto the canvas: no flowable layout pass, so large reports stay cheap
+    c = canvas.Canvas(save_path, pagesize=A4)
+    table_x = (PAGE_WIDTH - sum(COL_WIDTHS)) / 2
+    y = PAGE_HEIGHT - MARGIN
+
+    c.setFont("Helvetica-Bold", 18)
+    c.drawCentredString(PAGE_WIDTH / 2, y - 18, "PDF Duplicates Report")
+    y -= 48
+    c.setFont("Helvetica", 10)
+    for line in simpleSplit(f"Folder scanned: {folder_path}", "Helvetica", 10, PAGE_WIDTH - 2 * MARGIN):
+        c.drawString(MARGIN, y, line)
+        y -= 14
+    y -= 6
+    c.setFont("Helvetica-Bold", 13)
+    for line in (f"Total exact text duplicates: {len(text_dups)}",
+                 f"Total exact visual duplicates: {len(exact_visual)}",
+                 f"Total near-duplicate visual PDFs: {len(near_visual)}",
+                 f"Total byte-identical files: {len(binary_dups)}"):
+        c.drawString(MARGIN, y, line)
+        y -= 20
+
+    def draw_row(y, cells, height, header=False):
+        x = table_x
+        for width, cell in zip(COL_WIDTHS, cells):
+            c.setFillColor(colors.grey if header else colors.beige)
+            c.rect(x, y - height, width, height, stroke=1, fill=1)
+            c.setFillColor(colors.whitesmoke if header else colors.black)
+            if isinstance(cell, Image.Image):
+                c.drawImage(ImageReader(cell), x + (width - cell.width) / 2, y - height + CELL_PADDING,
+                            width=cell.width, height=cell.height)
+            else:
+                text_y = y - CELL_PADDING - CELL_FONT_SIZE
+                for line in cell:
+                    c.drawCentredString(x + width / 2, text_y, line)
+                    text_y -= CELL_LEADING
+            x += width
+        return y - height
+
+    def draw_header(y):
+        c.setLineWidth(0.5)
+        c.setStrokeColor(colors.black)
+        c.setFont("Helvetica-Bold", CELL_FONT_SIZE)
+        y = draw_row(y, [["Duplicate"], ["Original"], ["Distance"], ["Thumbnail"]],
+                     CELL_LEADING + 2 * CELL_PADDING + 4, header=True)
+        c.setFont("Helvetica", CELL_FONT_SIZE)
+        return y
 
     def add_table(title, duplicates, include_thumbnails):
-        elements.append(PageBreak())
-        elements.append(Paragraph(f"{title} ({len(duplicates)})", heading_style))
-        elements.append(Spacer(1, 12))
+        c.showPage()
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(MARGIN, PAGE_HEIGHT - MARGIN - 14, f"{title} ({len(duplicates)})")
 
         if not duplicates:
-            elements.append(Paragraph("None", normal_style))
-            elements.append(Spacer(1, 12))
+            c.setFont("Helvetica", 10)
+            c.drawString(MARGIN, PAGE_HEIGHT - MARGIN - 40, "None")
             return
 
-        table_data = [["Duplicate", "Original", "Distance", "Thumbnail"]]
-
+        y = draw_header(PAGE_HEIGHT - MARGIN - 32)
         for dup, orig, dist in duplicates:
-            row = [Paragraph(dup, cell_style), Paragraph(orig, cell_style), Paragraph(str(dist), cell_style)]
+            cells = [wrap_cell(str(value), width - 2 * CELL_PADDING)
+                     for value, width in zip((dup, orig, dist), COL_WIDTHS)]
             if include_thumbnails and dist >= 0:
                 try:
-                    doc_pdf = fitz.open(os.path.join(folder_path, dup))
-                    page = doc_pdf[0]
-                    pix = page.get_pixmap(dpi=50)
-                    img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
-                    thumb_path = os.path.join(tempdir, f"thumb_{dup}.png")
-                    img.thumbnail((80, 100))
-                    img.save(thumb_path)
-                    row.append(RLImage(thumb_path))
+                    cells.append(render_thumbnail(os.path.join(folder_path, dup)))
                 except Exception:
-                    row.append(Paragraph("Error", cell_style))
+                    cells.append(["Error"])
             else:
-                row.append("")
-            table_data.append(row)
-
-        table = Table(table_data, colWidths=[150, 150, 60, 100])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.grey),
-            ('TEXTCOLOR',(0,0),(-1,0),colors.whitesmoke),
-            ('ALIGN',(0,0),(-1,-1),'CENTER'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0,0), (-1,0), 8),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-            ('BACKGROUND',(0,1),(-1,-1),colors.beige),
-        ]))
-        elements.append(table)
-        elements.append(Spacer(1, 12))
+                cells.append([])
+
+            text_height = max(len(cell) for cell in cells if not isinstance(cell, Image.Image)) * CELL_LEADING
+            image_height = cells[-1].height if isinstance(cells[-1], Image.Image) else 0
+            height = max(text_height, image_height) + 2 * CELL_PADDING
+
+            if y - height < MARGIN:
+                c.showPage()
+                y = draw_header(PAGE_HEIGHT - MARGIN)
+            y = draw_row(y, cells, height)
 
     add_table("Exact Text Duplicates", text_dups, include_thumbnails=False)
     add_table("Exact Visual Duplicates", exact_visual, include_thumbnails=thumbnail)
     add_table("Near-Duplicate Visual PDFs", near_visual, include_thumbnails=thumbnail)
+    if binary_dups:
+        # Only filled by binary-only mode, which does no rendering
+        add_table("Byte-identical Files", binary_dups, include_thumbnails=False)
+
+    c.save()
+
+# ------------------------------
+# CSV Report Generation
+# ------------------------------
+CSV_THRESHOLD = 500  # Above this many duplicates the "auto" format writes CSV instead of PDF
 
-    doc.build(elements)
-    shutil.rmtree(tempdir, ignore_errors=True)
+def generate_csv_report(text_dups, exact_visual, near_visual, binary_dups, save_path):
+    with open(save_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("Type", "Duplicate", "Original", "Distance"))
+        writer.writerows(("Exact text", *row) for row in text_dups)
+        writer.writerows(("Exact visual", *row) for row in exact_visual)
+        writer.writerows(("Near visual", *row) for row in near_visual)
+        writer.writerows(("Byte-identical", *row) for row in binary_dups)
+
+def resolve_report_format(report_format, text_dups, exact_visual, near_visual, binary_dups):
+    if report_format != "auto":
+        return report_format
+    total = len(text_dups) + len(exact_visual) + len(near_visual) + len(binary_dups)
+    return "csv" if total > CSV_THRESHOLD else "pdf"
+
+def write_report(report_format, folder_path, text_dups, exact_visual, near_visual, binary_dups, save_path, thumbnail=True):
+    try:
+        if report_format == "csv":
+            generate_csv_report(text_dups, exact_visual, near_visual, binary_dups, save_path)
+        else:
+            generate_pdf_report(folder_path, text_dups, exact_visual, near_visual, binary_dups, save_path, thumbnail=thumbnail)
+    finally:
+        # Documents opened while scanning stay cached for the thumbnails; release them once the report is done
+        close_scanned_files()
 
 # ------------------------------
 # Main Execution
 # ------------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find duplicate PDFs in a folder")
+    parser.add_argument("--format", choices=["auto", "pdf", "csv"], default="auto",
+                        help=f"report format; auto writes CSV above {CSV_THRESHOLD} duplicates")
+    parser.add_argument("--binary-only", action="store_true",
+                        help="only report byte-identical files (much faster, no text or visual comparison)")
+    args = parser.parse_args()
+
     root = tk.Tk()
     root.withdraw()
 
@@ -184,18 +373,21 @@ if __name__ == "__main__":
         exit()
 
     print("Scanning PDFs for duplicates...")
-    text_dups, exact_visual, near_visual = find_duplicate_pdfs(folder_path, phash_threshold=5)
+    text_dups, exact_visual, near_visual, binary_dups = find_duplicate_pdfs(
+        folder_path, phash_threshold=5, use_visual=not args.binary_only)
 
-    default_name = f"PDF_Duplicates_Report_{datetime.datetime.now().strftime('%Y-%m-%d_%H-%M')}.pdf"
+    report_format = resolve_report_format(args.format, text_dups, exact_visual, near_visual, binary_dups)
+    extension = f".{report_format}"
+    default_name = f"PDF_Duplicates_Report_{datetime.datetime.now().strftime('%Y-%m-%d_%H-%M')}{extension}"
     save_path = filedialog.asksaveasfilename(
-        defaultextension=".pdf",
+        defaultextension=extension,
         initialfile=default_name,
-        filetypes=[("PDF files", "*.pdf")],
-        title="Save PDF report as..."
+        filetypes=[(f"{report_format.upper()} files", f"*{extension}")],
+        title=f"Save {report_format.upper()} report as..."
     )
     if not save_path:
         print("No save path selected. Exiting.")
         exit()
 
-    generate_pdf_report(folder_path, text_dups, exact_visual, near_visual, save_path)
-    print(f"Report generated: {save_path}")
\ No newline at end of file
+    write_report(report_format, folder_path, text_dups, exact_visual, near_visual, binary_dups, save_path)
+    print(f"Report generated: {save_path}")
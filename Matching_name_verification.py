@@ -12,8 +12,10 @@ It generates a PDF report listing files with:
 - Perfect matches are excluded from the report but counted in the summary
 
 Dependencies:
-- pdfplumber: Extract text from PDFs
+- pypdfium2: Extract text from PDFs
+- pdfplumber: Fallback extraction and OCR rendering for scanned pages
 - rapidfuzz: Perform fuzzy string matching
+- pyahocorasick: Scan for all candidate names in one pass
 - reportlab: Generate PDF reports
 - tkinter: GUI for folder selection and progress display
 """
@@ -21,24 +23,38 @@ Dependencies:
 import os
 import re
 import unicodedata
+import functools
+import itertools
 import logging
 import pdfplumber
-from rapidfuzz import fuzz
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from rapidfuzz import fuzz, process
+import ahocorasick
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib import colors
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Tuple, Optional
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import deque
+from typing import Dict, Iterator, List, Tuple, Optional
 import datetime
+import time
+import shelve
+import zlib
 import threading
+import queue
+import multiprocessing
 import sys
 import traceback
 import pytesseract
 from PIL import Image
 import io
+import numpy as np
 
 # ------------------------------
 # Logging Setup
@@ -48,6 +64,11 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# ------------------------------
+# Precompiled Patterns
+# ------------------------------
+_WS_RE = re.compile(r'\s+')
+
 # ------------------------------
 # Configuration
 # ------------------------------
@@ -55,68 +76,239 @@ class Config:
     """Configuration class with adjustable parameters"""
     NO_MATCH_THRESHOLD = 30        # Score below which we consider as no match
     PERFECT_MATCH_THRESHOLD = 100  # Score at which a match is considered perfect
-    MAX_WORKERS = 4                # Max number of threads for parallel PDF processing
+    MAX_WORKERS = os.cpu_count() or 4  # Max number of processes for parallel PDF processing
     CHUNK_SIZE = 2000              # Characters processed at a time for large PDFs
+    PAGE_PREFETCH = 4              # Pages read ahead while the current page is scored
+    PARALLEL_PAGES_MIN = 32        # Pages from which a scanned PDF is OCR'd by several processes
+    PAGE_BATCH_SIZE = 16           # Max pages per parallel extraction task
+    GUI_UPDATE_INTERVAL = 0.1      # Seconds between progress redraws (~10 Hz)
+    CELL_PADDING = 6               # Left/right padding of report table cells (points)
+    SCAN_CACHE_ENABLED = True      # Reuse results of unchanged PDFs; set False to neither read nor write the cache
+    SCAN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".pdf_name_scan_cache")  # Stale entries are pruned per scanned folder
+
+def _get_max_workers(n_files: int) -> int:
+    """Cap the worker pool at the configured maximum and the number of files"""
+    return max(1, min(Config.MAX_WORKERS, n_files))
 
 # ------------------------------
 # PDF Text Extraction
 # ------------------------------
-def extract_text_from_pdf(pdf_path: str) -> Tuple[str, Optional[str], str]:
+def iter_pdf_pages(pdf_path: str, pages: Optional[range] = None) -> Iterator[Tuple[int, Optional[str], Optional[str], bool, bool]]:
     """
-    Extracts text from a PDF file and determines its type:
-    - Text-only
-    - Image-only
-    - Mixed
+    Extracts text from a PDF one page at a time so callers can stop early.
+    Text is read with pypdfium2; pages where it finds no text are retried
+    with pdfplumber, and go through OCR if they contain images.
 
     Args:
         pdf_path (str): Path to PDF file
+        pages (Optional[range]): 1-based page numbers to read (default: all pages)
 
-    Returns:
-        Tuple[str, Optional[str], str]: (Extracted text, Error message, PDF type)
+    Yields:
+        Tuple[int, Optional[str], Optional[str], bool, bool]:
+            (Page number, Page text or None, Error message, Has images, Used OCR)
     """
-    text_content = []
-    error_message = None
-    has_text = False
-    has_images = False
-    used_ocr = False
+    try:
+        pdf = pdfium.PdfDocument(pdf_path)
+    except Exception as e:
+        error_message = f"Error opening PDF: {str(e)}"
+        logging.error(error_message)
+        yield 0, None, error_message, False, False
+        return
 
+    # Only opened when a page has no text layer (scanned pages)
+    fallback_pdf = None
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                page_text = None
-                try:
-                    # Try normal text extraction
-                    page_text = page.extract_text()
-
-                    if page_text and not page_text.isspace():
-                        has_text = True
-                        text_content.append(page_text)
-
-                    # Detect images
-                    if page.images and len(page.images) > 0:
-                        has_images = True
+        for page_num in (pages if pages is not None else range(1, len(pdf) + 1)):
+            page_text = None
+            error_message = None
+            has_images = False
+            used_ocr = False
+            page = None
+            try:
+                # Try normal text extraction
+                page = pdf[page_num - 1]
+                textpage = page.get_textpage()
+                extracted = textpage.get_text_range()
+                textpage.close()
+
+                if extracted and not extracted.isspace():
+                    page_text = extracted
+
+                # Detect images
+                for _ in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE]):
+                    has_images = True
+                    break
 
-                    # OCR fallback if no text found
-                    if (not page_text or page_text.isspace()) and page.images:
+                # pdfplumber fallback, then OCR, if no text found
+                if page_text is None:
+                    if fallback_pdf is None:
+                        fallback_pdf = pdfplumber.open(pdf_path)
+                    fallback_page = fallback_pdf.pages[page_num - 1]
+                    extracted = fallback_page.extract_text()
+
+                    if extracted and not extracted.isspace():
+                        page_text = extracted
+
+                    if page_text is None and fallback_page.images:
+                        has_images = True
                         used_ocr = True
                         # Convert PDF page to image
-                        page_image = page.to_image(resolution=300)
+                        page_image = fallback_page.to_image(resolution=300)
                         img_bytes = page_image.original.convert("RGB")
                         # Run OCR
                         ocr_text = pytesseract.image_to_string(img_bytes, lang="eng+fra")
                         if ocr_text and not ocr_text.isspace():
-                            has_text = True
-                            text_content.append(ocr_text)
+                            page_text = ocr_text
 
-                except Exception as e:
-                    error_message = f"Error on page {page_num}: {str(e)}"
-                    logging.warning(error_message)
+                    # Drop pdfplumber's cached layout objects so memory stays flat on long PDFs
+                    fallback_page.flush_cache()
 
-    except Exception as e:
-        error_message = f"Error opening PDF: {str(e)}"
-        logging.error(error_message)
+            except Exception as e:
+                error_message = f"Error on page {page_num}: {str(e)}"
+                logging.warning(error_message)
+            finally:
+                if page is not None:
+                    page.close()
+
+            yield page_num, page_text, error_message, has_images, used_ocr
+    finally:
+        if fallback_pdf is not None:
+            fallback_pdf.close()
+        pdf.close()
+
+def prefetch_pdf_pages(pdf_path: str, maxsize: int = Config.PAGE_PREFETCH) -> Iterator[Tuple[int, Optional[str], Optional[str], bool, bool]]:
+    """
+    Runs iter_pdf_pages in a background thread so the next pages are read
+    while the caller normalizes and scores the current one. Stopping early
+    (break/return in the caller) stops the reader thread too.
+
+    Args:
+        pdf_path (str): Path to PDF file
+        maxsize (int): Maximum number of pages read ahead
 
-    # Determine PDF type
+    Yields:
+        Same tuples as iter_pdf_pages
+    """
+    pages = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        # Give up once the consumer has stopped, so the reader never blocks on a full queue
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def reader():
+        try:
+            page_iter = iter_pdf_pages(pdf_path)
+            try:
+                for item in page_iter:
+                    if not put(item):
+                        break
+            finally:
+                page_iter.close()
+        except BaseException as e:
+            put(e)
+        finally:
+            # Always signal the end, even if closing the page iterator failed
+            put(done)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = pages.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+def count_scanned_pages(pdf_path: str) -> int:
+    """
+    Returns the number of pages in a PDF whose first page has no text layer
+    (a scanned document that will go through OCR), or 0 otherwise.
+    """
+    try:
+        pdf = pdfium.PdfDocument(pdf_path)
+    except Exception:
+        return 0
+    try:
+        if len(pdf) == 0:
+            return 0
+        page = pdf[0]
+        textpage = page.get_textpage()
+        first_text = textpage.get_text_range()
+        textpage.close()
+        page.close()
+        return 0 if first_text and not first_text.isspace() else len(pdf)
+    except Exception:
+        return 0
+    finally:
+        pdf.close()
+
+def extract_page_batch(pdf_path: str, first_page: int, last_page: int) -> List[Tuple[int, Optional[str], Optional[str], bool, bool]]:
+    """Extracts pages first_page..last_page (1-based, inclusive) in a worker process."""
+    return list(iter_pdf_pages(pdf_path, range(first_page, last_page + 1)))
+
+def parallel_pdf_pages(pdf_path: str, page_workers: int) -> Iterator[Tuple[int, Optional[str], Optional[str], bool, bool]]:
+    """
+    Splits a long scanned PDF into page batches OCR'd by a pool of processes
+    and yields the pages in order, so callers can still stop at the first match.
+    PDFs with a text layer read faster than a worker process starts, so they,
+    short PDFs, and a single worker fall back to prefetch_pdf_pages.
+
+    Args:
+        pdf_path (str): Path to PDF file
+        page_workers (int): Number of processes to extract pages with
+
+    Yields:
+        Same tuples as iter_pdf_pages
+    """
+    page_count = count_scanned_pages(pdf_path) if page_workers > 1 else 0
+    if page_count < Config.PARALLEL_PAGES_MIN:
+        yield from prefetch_pdf_pages(pdf_path)
+        return
+
+    # Small batches keep the first pages coming back quickly for the early exit
+    batch_size = max(1, min(Config.PAGE_BATCH_SIZE, -(-page_count // page_workers)))
+    executor = ProcessPoolExecutor(
+        max_workers=page_workers,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+    batch_starts = iter(range(1, page_count + 1, batch_size))
+    finished = False
+    try:
+        # Sliding window: at most one batch per worker is queued, so stopping
+        # early leaves no backlog of OCR work behind
+        futures = deque(
+            executor.submit(extract_page_batch, pdf_path, first, min(first + batch_size - 1, page_count))
+            for first in itertools.islice(batch_starts, page_workers)
+        )
+        while futures:
+            pages = futures.popleft().result()
+            first = next(batch_starts, None)
+            if first is not None:
+                futures.append(executor.submit(extract_page_batch, pdf_path, first, min(first + batch_size - 1, page_count)))
+            yield from pages
+        finished = True
+    finally:
+        # On early exit, do not wait for batches still being OCR'd: the caller has its answer
+        executor.shutdown(wait=finished, cancel_futures=True)
+
+def describe_pdf_type(pdf_path: str, has_text: bool, has_images: bool, used_ocr: bool) -> str:
+    """
+    Builds the PDF type label (Text-only, Image-only, Mixed, + OCR)
+    and prints it for the console log.
+    """
     if has_text and has_images:
         pdf_type = "Mixed (text + image)"
     elif has_text:
@@ -132,31 +324,55 @@ def extract_text_from_pdf(pdf_path: str) -> Tuple[str, Optional[str], str]:
 
     # Print detection info
     print(f"[PDF Type] {os.path.basename(pdf_path)} → {pdf_type}")
-
-    return " ".join(text_content), error_message, pdf_type
+    return pdf_type
 
 # ------------------------------
 # Text Normalization
 # ------------------------------
+# Short strings (filename parts, candidate names) repeat across files; page text does not
+NORMALIZE_CACHE_MAX_LEN = 256
+
+def _strip_accents_slow(text: str) -> str:
+    return ''.join(
+        c for c in unicodedata.normalize('NFKD', text)
+        if not unicodedata.combining(c)
+    )
+
+# Latin-1 and Latin Extended-A/B characters mapped to their accent-stripped form in one table
+_ACCENT_TABLE = str.maketrans({
+    code: _strip_accents_slow(chr(code))
+    for code in range(0x80, 0x250)
+    if _strip_accents_slow(chr(code)) != chr(code)
+})
+
+def _normalize_uncached(text: str, preserve_accents: bool) -> str:
+    text = str(text)
+    if not preserve_accents and not text.isascii():
+        # Remove accents: one translate pass covers Latin text, NFKD handles whatever is left
+        text = text.translate(_ACCENT_TABLE)
+        if not text.isascii():
+            text = _strip_accents_slow(text)
+    # Normalize spaces and lowercase
+    text = _WS_RE.sub(' ', text)
+    return text.strip().lower()
+
+@functools.lru_cache(maxsize=100_000)
+def _normalize_cached(text: str, preserve_accents: bool) -> str:
+    return _normalize_uncached(text, preserve_accents)
+
 def normalize_text(text: str, preserve_accents: bool = False) -> str:
     """
     Normalize text for comparison:
     - Optionally remove accents
     - Convert to lowercase
     - Collapse multiple spaces
+    Short strings are memoized; long page text is normalized directly.
     """
     if not text:
         return ""
-    text = str(text)
-    if not preserve_accents:
-        # Remove accents
-        text = ''.join(
-            c for c in unicodedata.normalize('NFKD', text)
-            if not unicodedata.combining(c)
-        )
-    # Normalize spaces and lowercase
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip().lower()
+    if isinstance(text, str) and len(text) <= NORMALIZE_CACHE_MAX_LEN:
+        return _normalize_cached(text, preserve_accents)
+    return _normalize_uncached(text, preserve_accents)
 
 # ------------------------------
 # Filename Tokenization
@@ -182,7 +398,8 @@ def extract_name_tokens(filename: str) -> List[str]:
 
     for part in parts:
         norm_no_accents = normalize_text(part, preserve_accents=False)
-        norm_with_accents = normalize_text(part, preserve_accents=True)
+        # ASCII parts have no accents to strip, so both variants are the same string
+        norm_with_accents = norm_no_accents if part.isascii() else normalize_text(part, preserve_accents=True)
 
         if (norm_no_accents and not norm_no_accents.isspace()) or \
            (norm_with_accents and not norm_with_accents.isspace()):
@@ -193,146 +410,361 @@ def extract_name_tokens(filename: str) -> List[str]:
 # ------------------------------
 # Matching Functions
 # ------------------------------
-def is_bidirectional_match(a: str, b: str) -> bool:
+NO_NAME_TOKENS_ERROR = "No valid alphabetic name tokens found"
+
+def extract_alpha_tokens(filename: str) -> List[Tuple[str, str]]:
     """
-    Simple exact match check after normalization
+    Name tokens from the filename that are purely alphabetic (IDs and dates are dropped).
+    An empty list means there is no name to look for in the PDF.
     """
-    return normalize_text(a) == normalize_text(b)
+    tokens = extract_name_tokens(filename)
+    return [(no_acc, with_acc) for no_acc, with_acc in tokens if no_acc.isalpha()]
 
-def find_exact_word_match(word: str, text: str) -> Tuple[bool, str, List[str]]:
+def build_name_candidates(alpha_tokens: List[Tuple[str, str]]) -> List[List[Tuple[str, Tuple[str, str]]]]:
     """
-    Checks if the exact phrase appears in the text (normalized whitespace)
+    Build every name string to look for in the PDF text.
+
+    A single token is searched on its own; otherwise each token pair is
+    searched as "first last", "last first" and "first, last". Candidates
+    are grouped per token/combination, each group holding the no-accent
+    and accented variants, in the order they are scored. A name already
+    produced earlier (e.g. the accented variant of an ASCII-only name)
+    is not repeated.
 
     Returns:
-        Tuple[bool, str, List[str]]: (found, full_match_text, context_matches)
+        List[List[Tuple[str, Tuple[str, str]]]]: Groups of (name, best_pair)
     """
-    norm_word = normalize_text(word)
-    norm_text = normalize_text(text)
-    if f" {norm_word} " in f" {norm_text} ":
-        return True, word, []
-    return False, "", []
+    seen = set()
 
-def get_best_ngram_match(name: str, chunk: str, ngram_range=(2, 5)):
+    def unique(group):
+        kept = [(name, pair) for name, pair in group if name not in seen]
+        seen.update(name for name, _ in kept)
+        return kept
+
+    if len(alpha_tokens) == 1:
+        no_acc, with_acc = alpha_tokens[0]
+        return [unique([(no_acc, (no_acc, "")), (with_acc, (with_acc, ""))])]
+
+    groups = []
+    for i in range(len(alpha_tokens)):
+        for j in range(i + 1, len(alpha_tokens)):
+            first_no_acc, first_with_acc = alpha_tokens[i]
+            last_no_acc, last_with_acc = alpha_tokens[j]
+            pair = (first_with_acc, last_with_acc)
+
+            combinations = [
+                (f"{first_no_acc} {last_no_acc}", f"{first_with_acc} {last_with_acc}"),
+                (f"{last_no_acc} {first_no_acc}", f"{last_with_acc} {first_with_acc}"),
+                (f"{first_no_acc}, {last_no_acc}", f"{first_with_acc}, {last_with_acc}")
+            ]
+            for no_acc_combined, with_acc_combined in combinations:
+                group = unique([(no_acc_combined, pair), (with_acc_combined, pair)])
+                if group:
+                    groups.append(group)
+    return groups
+
+def build_candidate_automaton(candidates: List[Tuple[str, Tuple[str, str]]]) -> "ahocorasick.Automaton":
+    """
+    Build an Aho-Corasick automaton over all candidate names, each wrapped
+    in single spaces so only whole phrases match. The value stored for a
+    name is its index in ``candidates`` (the first one, for duplicates).
     """
-    For a chunk of text, find the n-gram substring that best matches a name
-    using fuzzy matching.
+    automaton = ahocorasick.Automaton()
+    for idx, (name, _) in enumerate(candidates):
+        key = f" {name} "
+        if key not in automaton:
+            automaton.add_word(key, idx)
+    automaton.make_automaton()
+    return automaton
+
+def find_exact_candidate(automaton: "ahocorasick.Automaton",
+                         candidates: List[Tuple[str, Tuple[str, str]]],
+                         padded_texts: List[str]) -> Optional[Tuple[str, Tuple[str, str]]]:
     """
-    words = chunk.split()
-    candidates = set()
-    for n in range(ngram_range[0], ngram_range[1]+1):
-        for i in range(len(words) - n + 1):
-            candidates.add(" ".join(words[i:i+n]))
-    candidates.add(chunk)  # fallback
-    from rapidfuzz import process
-    match, score, _ = process.extractOne(name, candidates)
-    return match if match else chunk
+    Find the first candidate name appearing as a whole phrase in the text
+    using a single Aho-Corasick pass per text variant.
+
+    Args:
+        automaton: Automaton from build_candidate_automaton()
+        candidates: Flat list of (name, best_pair), in priority order
+        padded_texts: Normalized text variants wrapped in single spaces
+
+    Returns:
+        Optional[Tuple[str, Tuple[str, str]]]: Highest-priority match, or None
+    """
+    for padded_text in padded_texts:
+        hits = [idx for _, idx in automaton.iter(padded_text)]
+        if hits:
+            return candidates[min(hits)]
+    return None
+
+def tail_words(text: str, min_length: int) -> str:
+    """
+    Return the shortest run of whole words at the end of ``text`` that is
+    at least ``min_length`` characters long (or all of ``text``).
+    Used to carry a page's ending into the next page's scan.
+    """
+    if len(text) <= min_length:
+        return text
+    cut = text.rfind(" ", 0, len(text) - min_length)
+    return text[cut + 1:]
+
+def get_best_ngram_match(name: str, chunk: str) -> str:
+    """
+    For a chunk of text, find the substring that best matches a name
+    using fuzzy alignment, snapped to whole words for display.
+    """
+    alignment = fuzz.partial_ratio_alignment(name, chunk)
+    start, end = alignment.dest_start, alignment.dest_end
+    if start >= end:
+        return chunk
+    # Snap each edge to the nearest word boundary so the report never shows a cut-off word
+    left, right = start, start
+    while left > 0 and not chunk[left - 1].isspace():
+        left -= 1
+    while right < len(chunk) and not chunk[right].isspace():
+        right += 1
+    start = left if start - left <= right - start else right
+    left, right = end, end
+    while left > 0 and not chunk[left - 1].isspace():
+        left -= 1
+    while right < len(chunk) and not chunk[right].isspace():
+        right += 1
+    end = left if end - left < right - end else right
+    return chunk[start:end].strip() or chunk[alignment.dest_start:alignment.dest_end]
 
 # ------------------------------
 # Main PDF Name Checker
 # ------------------------------
-def check_name_in_pdf(pdf_path: str) -> Dict:
+def check_name_in_pdf(pdf_path: str, page_workers: int = 1) -> Dict:
     """
     Check PDF text against filename name tokens.
+    With page_workers > 1, pages of long scanned PDFs are OCR'd in parallel
+    and fuzzy scoring runs on that many threads.
 
     Returns a dictionary with:
     - best_pair: matched name tokens
     - best_score: similarity score 0-100
     - matched_text: substring from PDF that best matches
     - error: any error encountered
+    - read_error: first error reading the PDF or a page, if any (the scan cache skips such results)
     """
-    pdf_text, error, pdf_type = extract_text_from_pdf(pdf_path)
-
-    # Normalize text for matching
-    pdf_no_accents = normalize_text(pdf_text, preserve_accents=False)
-    pdf_with_accents = normalize_text(pdf_text, preserve_accents=True)
-    pdf_no_accents_norm = re.sub(r'\s+', ' ', pdf_no_accents)
-    pdf_with_accents_norm = re.sub(r'\s+', ' ', pdf_with_accents)
-
-    tokens = extract_name_tokens(pdf_path)
-    alpha_tokens = [(no_acc, with_acc) for no_acc, with_acc in tokens if no_acc.isalpha()]
+    alpha_tokens = extract_alpha_tokens(pdf_path)
 
     if not alpha_tokens:
-        return {"best_pair": None, "best_score": 0, "error": "No valid alphabetic name tokens found"}
+        return {
+            "best_pair": None,
+            "best_score": 0,
+            "matched_text": "",
+            "error": NO_NAME_TOKENS_ERROR,
+            "pdf_type": None,
+            "read_error": None
+        }
+
+    candidate_groups = build_name_candidates(alpha_tokens)
+    candidates = [candidate for group in candidate_groups for candidate in group]
+    automaton = build_candidate_automaton(candidates)
+    # Enough of the previous page to catch a name split across the page break
+    carry_length = max(len(name) for name, _ in candidates)
 
+    # Normalized page texts per variant (no accents, with accents)
+    pages_no_accents = []
+    pages_with_accents = []
+    has_images = False
+    used_ocr = False
+    read_error = None
+
+    # Stream pages and stop at the first exact phrase match
+    for _, page_text, page_error, page_has_images, page_used_ocr in parallel_pdf_pages(pdf_path, page_workers):
+        read_error = read_error or page_error
+        has_images = has_images or page_has_images
+        used_ocr = used_ocr or page_used_ocr
+        if not page_text:
+            continue
+
+        padded_texts = []
+        for pages, preserve_accents in ((pages_no_accents, False), (pages_with_accents, True)):
+            page_norm = normalize_text(page_text, preserve_accents=preserve_accents)
+            carry = tail_words(pages[-1], carry_length) if pages else ""
+            padded_texts.append(f" {carry} {page_norm} ")
+            pages.append(page_norm)
+
+        exact = find_exact_candidate(automaton, candidates, padded_texts)
+        if exact:
+            name, pair = exact
+            return {
+                "best_pair": pair,
+                "best_score": 100,
+                "matched_text": name,
+                "error": None,
+                "pdf_type": describe_pdf_type(pdf_path, True, has_images, used_ocr),
+                "read_error": read_error
+            }
+
+    pdf_type = describe_pdf_type(pdf_path, bool(pages_no_accents), has_images, used_ocr)
+    text_variants = [" ".join(pages_no_accents), " ".join(pages_with_accents)]
+
+    # Fuzzy matching for partial match
     best_pair = None
     best_score = 0
     best_matched_text = ""
-    perfect_match_found = False
-
-    # Case 1: single-token names
-    if len(alpha_tokens) == 1:
-        no_acc, with_acc = alpha_tokens[0]
-        for text in [pdf_no_accents_norm, pdf_with_accents_norm]:
-            for name in [no_acc, with_acc]:
-                found, full_match, context_matches = find_exact_word_match(name, text)
-                if found and is_bidirectional_match(full_match, name):
-                    perfect_match_found = True
-                    best_score = 100
-                    best_pair = (name, "")
-                    best_matched_text = full_match
-                    break
-                # Fuzzy matching for partial match
-                for chunk_start in range(0, len(text), Config.CHUNK_SIZE):
-                    chunk = text[chunk_start:chunk_start + Config.CHUNK_SIZE]
-                    ratio = fuzz.ratio(name, chunk)
-                    partial = fuzz.partial_ratio(name, chunk)
-                    score = max(ratio, partial)
-                    if not perfect_match_found and score > best_score:
-                        best_score = min(score, Config.PERFECT_MATCH_THRESHOLD - 1)
-                        best_pair = (name, "")
-                        best_matched_text = get_best_ngram_match(name, chunk)
-            if perfect_match_found:
-                break
 
-    # Case 2: multi-token names
-    if not perfect_match_found:
-        for i in range(len(alpha_tokens)):
-            for j in range(i + 1, len(alpha_tokens)):
-                first_no_acc, first_with_acc = alpha_tokens[i]
-                last_no_acc, last_with_acc = alpha_tokens[j]
-
-                combinations = [
-                    (f"{first_no_acc} {last_no_acc}", f"{first_with_acc} {last_with_acc}"),
-                    (f"{last_no_acc} {first_no_acc}", f"{last_with_acc} {first_with_acc}"),
-                    (f"{first_no_acc}, {last_no_acc}", f"{first_with_acc}, {last_with_acc}")
-                ]
-
-                for no_acc_combined, with_acc_combined in combinations:
-                    for text in [pdf_no_accents_norm, pdf_with_accents_norm]:
-                        for name in [no_acc_combined, with_acc_combined]:
-                            found, full_match, _ = find_exact_word_match(name, text)
-                            if found and is_bidirectional_match(full_match, name):
-                                perfect_match_found = True
-                                best_score = 100
-                                best_pair = (first_with_acc, last_with_acc)
-                                best_matched_text = full_match
-                                break
-                            for chunk_start in range(0, len(text), Config.CHUNK_SIZE):
-                                chunk = text[chunk_start:chunk_start + Config.CHUNK_SIZE]
-                                ratio = fuzz.ratio(name, chunk)
-                                partial = fuzz.partial_ratio(name, chunk)
-                                score = max(ratio, partial)
-                                if not perfect_match_found and score > best_score:
-                                    best_score = min(score, Config.PERFECT_MATCH_THRESHOLD - 1)
-                                    best_pair = (first_with_acc, last_with_acc)
-                                    best_matched_text = get_best_ngram_match(name, chunk)
-                        if perfect_match_found:
-                            break
-                    if perfect_match_found:
-                        break
-                if perfect_match_found:
-                    break
-            if perfect_match_found:
-                break
+    # Slice each text variant once rather than once per candidate name. Chunks overlap by the
+    # longest candidate, so a name can never straddle a chunk boundary.
+    chunk_step = max(1, Config.CHUNK_SIZE - carry_length)
+    chunked_variants = [
+        [text[start:start + Config.CHUNK_SIZE] for start in range(0, len(text), chunk_step)]
+        for text in text_variants
+    ]
+
+    # Flatten the groups so every name is scored against every chunk in one batched call
+    queries = [name for group in candidate_groups for name, _ in group]
+    pairs = [pair for group in candidate_groups for _, pair in group]
+    group_bounds = []
+    for group in candidate_groups:
+        start = group_bounds[-1][1] if group_bounds else 0
+        group_bounds.append((start, start + len(group)))
+
+    score_matrices = []
+    for chunks in chunked_variants:
+        if not chunks:
+            score_matrices.append(None)
+            continue
+        scores = process.cdist(queries, chunks, scorer=fuzz.partial_ratio, dtype=np.float64, workers=page_workers)
+        # Against a full CHUNK_SIZE chunk, fuzz.ratio of a short name is a few percent at most,
+        # so it can only beat partial_ratio on the shorter last chunk
+        if len(chunks[-1]) < Config.CHUNK_SIZE:
+            tail = process.cdist(queries, chunks[-1:], scorer=fuzz.ratio, dtype=np.float64, workers=page_workers)
+            np.maximum(scores[:, -1:], tail, out=scores[:, -1:])
+        score_matrices.append(scores)
+
+    # Keep the first best score in (group, text variant, name, chunk) order
+    best = None
+    for start, end in group_bounds:
+        for variant_idx, scores in enumerate(score_matrices):
+            if scores is None:
+                continue
+            block = scores[start:end]
+            flat_idx = int(block.argmax())
+            score = float(block.flat[flat_idx])
+            if score > best_score:
+                best_score = score
+                row, col = divmod(flat_idx, block.shape[1])
+                best = (start + row, variant_idx, col)
+
+    if best is not None:
+        query_idx, variant_idx, chunk_idx = best
+        best_score = min(best_score, Config.PERFECT_MATCH_THRESHOLD - 1)
+        best_pair = pairs[query_idx]
+        best_matched_text = get_best_ngram_match(queries[query_idx], chunked_variants[variant_idx][chunk_idx])
 
     return {
         "best_pair": best_pair,
         "best_score": best_score,
         "matched_text": best_matched_text,
         "error": None,
-        "pdf_type": pdf_type
+        "pdf_type": pdf_type,
+        "read_error": read_error
     }
 
+# ------------------------------
+# Scan Result Cache
+# ------------------------------
+SCAN_CACHE_VERSION = 2  # Bump when matching logic or the entry layout changes so old results are ignored
+
+CRC_BLOCK_SIZE = 1024 * 1024  # Read size when checksumming a whole file
+
+def scan_cache_settings() -> str:
+    """Digest of the Config values a scan result depends on, so changing them invalidates the cache"""
+    settings = (Config.NO_MATCH_THRESHOLD, Config.PERFECT_MATCH_THRESHOLD, Config.CHUNK_SIZE)
+    return f"{zlib.crc32(repr(settings).encode()):08x}"
+
+def scan_cache_key(pdf_path: str) -> str:
+    """
+    Key for a PDF in the scan cache: cache version, settings digest and
+    absolute path. The entry itself records the file's size, mtime and
+    CRC32, which tell whether the cached result still applies.
+    """
+    return f"{SCAN_CACHE_VERSION}|{scan_cache_settings()}|{os.path.abspath(pdf_path)}"
+
+def file_stat(pdf_path: str) -> Optional[Tuple[int, int]]:
+    """(size, mtime in ns) of a file, or None if it cannot be read"""
+    try:
+        st = os.stat(pdf_path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+def file_crc32(pdf_path: str) -> int:
+    """CRC32 of the whole file, read in blocks"""
+    crc = 0
+    with open(pdf_path, 'rb') as f:
+        while block := f.read(CRC_BLOCK_SIZE):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+def lookup_scan_cache(cache: shelve.Shelf, pdf_path: str, key: str, stat: Tuple[int, int]) -> Optional[Dict]:
+    """
+    Returns the cached result for a PDF if the file is unchanged, else None.
+    Unchanged size and mtime is a hit without reading the file. If only the
+    mtime changed (cloud-synced folders rewrite it), the whole file's CRC32
+    decides, so the file is only read when its stat differs.
+    """
+    entry = cache.get(key)
+    if entry is None or entry["size"] != stat[0]:
+        return None
+    if entry["mtime_ns"] != stat[1]:
+        try:
+            if file_crc32(pdf_path) != entry["crc"]:
+                return None
+        except OSError:
+            return None
+        entry["mtime_ns"] = stat[1]
+        cache[key] = entry
+    return entry["result"]
+
+def check_name_for_cache(pdf_path: str, page_workers: int = 1, with_crc: bool = False) -> Tuple[Dict, Optional[int]]:
+    """
+    Worker entry point: check_name_in_pdf() plus, for the scan cache, the
+    file's CRC32 taken before it is scanned (so a file edited meanwhile is
+    not stored under its new content).
+    """
+    crc = None
+    if with_crc:
+        try:
+            crc = file_crc32(pdf_path)
+        except OSError:
+            pass
+    return check_name_in_pdf(pdf_path, page_workers), crc
+
+def prune_scan_cache(cache: shelve.Shelf, folder_path: str, seen_keys: set):
+    """
+    Removes the scanned folder's entries that were not part of this run
+    (deleted or moved files, older settings) and entries of older cache
+    versions. Other folders' entries are kept, so switching between
+    folders still hits the cache.
+    """
+    folder = os.path.abspath(folder_path)
+    current = f"{SCAN_CACHE_VERSION}|"
+    for key in list(cache.keys()):
+        if not key.startswith(current):
+            del cache[key]
+        elif key not in seen_keys and os.path.dirname(key.split("|", 2)[2]) == folder:
+            del cache[key]
+
+def open_scan_cache() -> shelve.Shelf:
+    """
+    Opens the on-disk scan cache, or an in-memory one if it is disabled
+    or cannot be opened.
+    """
+    if not Config.SCAN_CACHE_ENABLED:
+        return shelve.Shelf({})
+    try:
+        return shelve.open(Config.SCAN_CACHE_PATH)
+    except Exception as e:
+        logging.warning(f"Scan cache unavailable, continuing without it: {str(e)}")
+        return shelve.Shelf({})
+
 # ------------------------------
 # GUI Class
 # ------------------------------
@@ -345,7 +777,10 @@ class PDFScannerGUI:
         self.root = tk.Tk()
         self.root.title("PDF Name Scanner")
         self.setup_gui()
-        self.processing_lock = threading.Lock()
+        self.last_progress_update = 0.0
+        self.scan_generation = 0   # Incremented per scan, so a finished report only closes its own run
+        self.report_thread = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_gui(self):
         """Initialize GUI layout with buttons, progress bar, and labels"""
@@ -353,7 +788,8 @@ class PDFScannerGUI:
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
         # Button to select folder and start processing
-        ttk.Button(main_frame, text="Select Folder", command=self.process_folder).grid(row=0, column=0, pady=5)
+        self.select_button = ttk.Button(main_frame, text="Select Folder", command=self.process_folder)
+        self.select_button.grid(row=0, column=0, pady=5)
 
         # Progress bar section
         progress_frame = ttk.LabelFrame(main_frame, text="Progress", padding="5")
@@ -365,8 +801,14 @@ class PDFScannerGUI:
         ttk.Label(progress_frame, textvariable=self.status_var).grid(row=1, column=0, pady=2)
         ttk.Label(progress_frame, textvariable=self.detail_var).grid(row=2, column=0, pady=2)
 
-    def safe_update_gui(self, status=None, detail=None, progress=None):
-        """Thread-safe GUI updates"""
+    def safe_update_gui(self, status=None, detail=None, progress=None, force=False):
+        """Thread-safe GUI updates, with progress updates throttled to GUI_UPDATE_INTERVAL unless forced"""
+        if not force and progress is not None and progress < self.progress["maximum"]:
+            now = time.monotonic()
+            if now - self.last_progress_update < Config.GUI_UPDATE_INTERVAL:
+                return
+            self.last_progress_update = now
+
         def update():
             if status is not None:
                 self.status_var.set(status)
@@ -374,8 +816,13 @@ class PDFScannerGUI:
                 self.detail_var.set(detail)
             if progress is not None:
                 self.progress["value"] = progress
-            self.root.update()
-        self.root.after(0, update)
+
+        if threading.current_thread() is threading.main_thread():
+            # Redraw only; no event processing re-entering the running scan
+            update()
+            self.root.update_idletasks()
+        else:
+            self.root.after(0, update)
 
     # ------------------------------
     # Folder Processing
@@ -385,8 +832,11 @@ class PDFScannerGUI:
         folder_path = filedialog.askdirectory(title="Select the folder containing PDFs")
         if not folder_path:
             return
+        self.scan_generation += 1
 
-        pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.pdf')]
+        # scandir reads the entry type from the directory listing, so skipping folders needs no extra stat
+        with os.scandir(folder_path) as entries:
+            pdf_files = [e.name for e in entries if e.name[-4:].lower() == '.pdf' and e.is_file()]
         total_files = len(pdf_files)
         if total_files == 0:
             messagebox.showerror("No PDFs Found", "No PDF files found in the selected folder.")
@@ -404,38 +854,97 @@ class PDFScannerGUI:
         self.progress["maximum"] = total_files
         self.progress["value"] = 0
 
-        # Parallel PDF processing
-        with ThreadPoolExecutor(max_workers=Config.MAX_WORKERS) as executor:
-            futures = {executor.submit(check_name_in_pdf, os.path.join(folder_path, f)): f for f in pdf_files}
-            completed = 0
-            for future in as_completed(futures):
-                file = futures[future]
-                try:
-                    res = future.result()
-                    pdf_type = res["pdf_type"]
-                    score = res["best_score"]
-                    pair = res["best_pair"]
-                    error = res.get("error")
-                    matched_text = res.get("matched_text", "")
-
-                    if error:
-                        results["errors"].append((file, error))
-                    elif score < Config.NO_MATCH_THRESHOLD:
-                        results["no_match"].append((file, pdf_type, pair, score, matched_text))
-                    elif score < Config.PERFECT_MATCH_THRESHOLD:
-                        results["partial_match"].append((file, pdf_type, pair, score, matched_text))
-                    else:
-                        results["perfect_match"].append((file, pdf_type, pair, score, matched_text))
-                except Exception as e:
-                    results["errors"].append((file, f"Processing error: {str(e)}"))
-
+        def record(file: str, res: Dict):
+            pdf_type = res["pdf_type"]
+            score = res["best_score"]
+            pair = res["best_pair"]
+            error = res.get("error")
+            matched_text = res.get("matched_text", "")
+
+            if error:
+                results["errors"].append((file, error))
+            elif score < Config.NO_MATCH_THRESHOLD:
+                results["no_match"].append((file, pdf_type, pair, score, matched_text))
+            elif score < Config.PERFECT_MATCH_THRESHOLD:
+                results["partial_match"].append((file, pdf_type, pair, score, matched_text))
+            else:
+                results["perfect_match"].append((file, pdf_type, pair, score, matched_text))
+
+        completed = 0
+        with open_scan_cache() as cache:
+            # Unchanged files seen in a previous run are answered from the cache
+            pending = {}
+            seen_keys = set()
+            for f in pdf_files:
+                # Nothing to look for: report it without reading or dispatching the PDF
+                if not extract_alpha_tokens(f):
+                    results["errors"].append((f, NO_NAME_TOKENS_ERROR))
+                    completed += 1
+                    self.safe_update_gui(
+                        status=f"Processing: {completed}/{total_files}",
+                        detail=f"Skipped: {f}",
+                        progress=completed
+                    )
+                    continue
+
+                # Only a stat per file here; files are read (CRC32) in the workers, or when their mtime changed
+                pdf_path = os.path.join(folder_path, f)
+                stat = file_stat(pdf_path) if Config.SCAN_CACHE_ENABLED else None
+                key = scan_cache_key(pdf_path) if stat else None
+                if key:
+                    seen_keys.add(key)
+                cached = lookup_scan_cache(cache, pdf_path, key, stat) if key else None
+                if cached is None:
+                    pending[f] = (key, stat)
+                    continue
+                record(f, cached)
                 completed += 1
                 self.safe_update_gui(
                     status=f"Processing: {completed}/{total_files}",
-                    detail=f"Current file: {file}",
+                    detail=f"Cached: {f}",
                     progress=completed
                 )
 
+            # With fewer files than workers, give each file the spare cores for OCR and fuzzy scoring
+            page_workers = max(1, Config.MAX_WORKERS // len(pending)) if pending else 1
+
+            # Parallel PDF processing: pdfplumber is pure Python, so use processes to get past the GIL
+            with ProcessPoolExecutor(
+                max_workers=_get_max_workers(max(1, len(pending))),
+                mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                futures = {
+                    executor.submit(check_name_for_cache, os.path.join(folder_path, f), page_workers, key is not None): f
+                    for f, (key, _) in pending.items()
+                }
+                for future in as_completed(futures):
+                    file = futures[future]
+                    try:
+                        res, crc = future.result()
+                        record(file, res)
+                        key, stat = pending[file]
+                        # Errors may be transient (file locked, still syncing): scan those again next time
+                        if key and crc is not None and not (res.get("error") or res.get("read_error")):
+                            cache[key] = {"size": stat[0], "mtime_ns": stat[1], "crc": crc, "result": res}
+                    except Exception as e:
+                        results["errors"].append((file, f"Processing error: {str(e)}"))
+
+                    completed += 1
+                    self.safe_update_gui(
+                        status=f"Processing: {completed}/{total_files}",
+                        detail=f"Current file: {file}",
+                        progress=completed
+                    )
+
+            prune_scan_cache(cache, folder_path, seen_keys)
+
+        # The last per-file update may have been throttled or skipped; always draw the final state
+        self.safe_update_gui(
+            status=f"Processing: {completed}/{total_files}",
+            progress=completed,
+            force=True
+        )
+
         # Save PDF report
         default_name = f"PDF_Name_Duplicate_Report_{datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.pdf"
         save_path = filedialog.asksaveasfilename(
@@ -445,13 +954,46 @@ class PDFScannerGUI:
             title="Save PDF report as..."
         )
         if save_path:
-            self.generate_enhanced_pdf_report(results, save_path)
-            self.safe_update_gui(
-                status="Processing complete",
-                detail=f"Report generated: {save_path}"
+            # Large reports take a while to build; keep the window responsive meanwhile.
+            # No new scan may start until the report is written.
+            self.select_button.config(state="disabled")
+            self.safe_update_gui(status="Generating report...", detail=save_path)
+            # Not a daemon: exiting the interpreter must not cut the report file short
+            self.report_thread = threading.Thread(
+                target=self.write_report_and_close,
+                args=(results, save_path, self.scan_generation)
             )
-            # Auto-close after 1.5s
-            self.root.after(1500, self.root.destroy)
+            self.report_thread.start()
+
+    def write_report_and_close(self, results: Dict, save_path: str, generation: int):
+        """Builds the report in a background thread, then closes the window"""
+        try:
+            self.generate_enhanced_pdf_report(results, save_path)
+        except Exception as e:
+            logging.error(f"Report generation failed: {str(e)}")
+            self.safe_update_gui(status="Report generation failed", detail=str(e))
+            self.root.after(0, lambda: self.select_button.config(state="normal"))
+            return
+        self.safe_update_gui(
+            status="Processing complete",
+            detail=f"Report generated: {save_path}"
+        )
+        # Auto-close after 1.5s
+        self.root.after(1500, lambda: self.close_after_report(generation))
+
+    def close_after_report(self, generation: int):
+        """Closes the window unless a new scan has started since the report began"""
+        if generation == self.scan_generation:
+            self.root.destroy()
+
+    def on_close(self):
+        """Window close: wait for a report being written instead of leaving a truncated PDF"""
+        if self.report_thread is not None and self.report_thread.is_alive():
+            # Polled rather than joined: the report thread posts its updates through the event loop
+            self.safe_update_gui(status="Finishing report before closing...")
+            self.root.after(200, self.on_close)
+            return
+        self.root.destroy()
 
     # ------------------------------
     # PDF Report Generation
@@ -496,39 +1038,54 @@ class PDFScannerGUI:
                 elements.append(Spacer(1, 12))
                 return
 
+            col_widths = [120, 100, 100, 60, 100, 120]
+
+            def cell(text, width):
+                # Plain strings use the table-wide font; only text that needs wrapping becomes a Paragraph
+                if stringWidth(text, style_normal.fontName, style_normal.fontSize) <= width - 2 * Config.CELL_PADDING:
+                    return text
+                return Paragraph(escape(text), style_normal)
+
+            def row(values):
+                return [cell(value, width) for value, width in zip(values, col_widths)]
+
             data = []
+            # (row index, score) collected while building rows, used for colors afterwards
+            row_scores = []
             if title == "Errors":
-                data.append([Paragraph("Filename", style_normal), Paragraph("Error", style_normal)])
+                data.append(row(["Filename", "Error"]))
                 for file, error in items:
-                    data.append([Paragraph(file, style_normal), Paragraph(error, style_normal)])
+                    data.append(row([file, error]))
             else:
-                data.append([
-                    Paragraph("Filename", style_normal),
-                    Paragraph("PDF Type", style_normal),
-                    Paragraph("Name Detected", style_normal),
-                    Paragraph("Score (%)", style_normal),
-                    Paragraph("Best Filename", style_normal),
-                    Paragraph("Closest Text", style_normal)
-                ])
+                data.append(row(["Filename", "PDF Type", "Name Detected", "Score (%)", "Best Filename", "Closest Text"]))
                 for item in items:
                     file, pdf_type, pair, score, matched_text = item
                     pair_text = " ".join(p for p in pair if p) if pair else "N/A"
                     matched_text_display = matched_text if len(matched_text) <= 500 else matched_text[:497] + "..."
-                    data.append([
-                        Paragraph(file, style_normal),
-                        Paragraph(pdf_type, style_normal),
-                        Paragraph(pair_text, style_normal),
-                        Paragraph(f"{score:.0f}", style_normal),
-                        Paragraph(pair_text, style_normal),
-                        Paragraph(matched_text_display, style_normal)
-                    ])
+                    row_scores.append((len(data), score))
+                    data.append(row([file, pdf_type, pair_text, f"{score:.0f}", pair_text, matched_text_display]))
 
-            col_widths = [120, 100, 100, 60, 100, 120]
             t = Table(data, colWidths=col_widths)
-            t.setStyle(TableStyle([
+            table_style = TableStyle([
+                ('FONTNAME', (0,0), (-1,-1), style_normal.fontName),
+                ('FONTSIZE', (0,0), (-1,-1), style_normal.fontSize),
+                ('LEADING', (0,0), (-1,-1), style_normal.leading),
+                ('VALIGN', (0,0), (-1,-1), 'TOP'),
+                ('LEFTPADDING', (0,0), (-1,-1), Config.CELL_PADDING),
+                ('RIGHTPADDING', (0,0), (-1,-1), Config.CELL_PADDING),
                 ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
                 ('BACKGROUND', (0,0), (-1,0), colors.lightgrey)
-            ]))
+            ])
+            # Score column: green (perfect), orange (partial), red (no match)
+            for i, score in row_scores:
+                if score >= Config.PERFECT_MATCH_THRESHOLD:
+                    score_color = colors.green
+                elif score >= Config.NO_MATCH_THRESHOLD:
+                    score_color = colors.orange
+                else:
+                    score_color = colors.red
+                table_style.add('TEXTCOLOR', (3,i), (3,i), score_color)
+            t.setStyle(table_style)
             elements.append(t)
             elements.append(Spacer(1, 12))
 
@@ -1,15 +1,49 @@
 import os
 import string
 import re
+import functools
 from datetime import datetime
-from PyPDF2 import PdfReader, PdfWriter
+import pypdfium2 as pdfium
 import traceback
 import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import tkinter as tk
 from tkinter import ttk
 from tkinter.filedialog import askopenfilenames, askdirectory
 import unicodedata
 
+# -------------------------
+# Precompiled Patterns
+# -------------------------
+
+_GREETING_RE = re.compile(r"^(Dear|Cher|Chère)[,]?\s+(.*)", re.I | re.M)
+_PN_RE = re.compile(r"PN[:\s]+(\d+)")
+_LEADING_DIGITS_RE = re.compile(r"^\d+")
+
+# Lower-case greeting words; a page without any of them cannot match _GREETING_RE
+_GREETING_WORDS = ("dear", "cher", "chère")
+
+# Deletes every ASCII character that is not a letter, digit or one of "-_.() "
+_FILENAME_CHARS = set(string.ascii_letters + string.digits + "-_.() ")
+_SANITIZE_TABLE = {code: None for code in range(128) if chr(code) not in _FILENAME_CHARS}
+
+
+@functools.lru_cache(maxsize=4096)
+def _word_pattern(word):
+    """Compiled whole-word pattern for one name; names repeat across pages and files."""
+    return re.compile(rf"\b{re.escape(word)}\b")
+
+
+@functools.lru_cache(maxsize=4096)
+def _full_name_pattern(first_names, last_name):
+    """Compiled case-insensitive pattern for a full name (first_names is a tuple)."""
+    return re.compile(
+        r"\b" + r"\s+".join(map(re.escape, first_names)) + r"\s+" + re.escape(last_name) + r"\b",
+        re.IGNORECASE
+    )
+
 # -------------------------
 # Utilities
 # -------------------------
@@ -20,11 +54,45 @@ def sanitize_filename(name):
     Convert accented letters to their ASCII equivalents (è -> e), then keep
     letters, digits and allowed punctuation.
     """
-    allowed_extra = "-_.() "
     # Normalize to NFKD to decompose accents, then drop non-ASCII (the combining marks)
     normalized = unicodedata.normalize("NFKD", name)
     ascii_only = normalized.encode("ascii", "ignore").decode("ascii")
-    return "".join(c for c in ascii_only if c.isalpha() or c.isdigit() or c in allowed_extra)
+    return ascii_only.translate(_SANITIZE_TABLE)
+
+
+def claim_filename(filename):
+    """
+    Create filename exclusively and return it, or the first free "name_2.pdf",
+    "name_3.pdf", ... if it is taken. The check and the creation are one atomic
+    step, so two workers producing the same name never overwrite each other.
+    """
+    root, ext = os.path.splitext(filename)
+    counter = 1
+    while True:
+        candidate = filename if counter == 1 else f"{root}_{counter}{ext}"
+        try:
+            fd = os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            counter += 1
+            continue
+        os.close(fd)
+        return candidate
+
+
+def extract_page_text(pdf, page_index):
+    """
+    Extract the text layer of one page with PDFium (C++), which is much faster
+    than a pure-Python extractor.
+    """
+    page = pdf[page_index]
+    try:
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+    finally:
+        page.close()
 
 
 def page_verification(text):
@@ -32,8 +100,8 @@ def page_verification(text):
     Lightweight heuristic to confirm if a page starts a new employee letter.
     Looks for key phrases like "Dear", "Cher" or "Chère".
     """
-    required_phrases = ["dear", "cher", "chère"]
-    return any(phrase in text.lower() for phrase in required_phrases)
+    text_lower = text.lower()
+    return any(phrase in text_lower for phrase in _GREETING_WORDS)
 
 
 def find_number_below_name(text, first_names, last_name, max_lines_below=3):
@@ -45,15 +113,12 @@ def find_number_below_name(text, first_names, last_name, max_lines_below=3):
         Dear John
     Returns: the number as string, or None if not found.
     """
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
     if not first_names or not last_name:
         return None
+    lines = [line for line in map(str.strip, text.splitlines()) if line]
 
-    # Build a regex that matches the entire full name (first names + last name)
-    name_pattern = re.compile(
-        r"\b" + r"\s+".join(map(re.escape, first_names)) + r"\s+" + re.escape(last_name) + r"\b",
-        re.IGNORECASE
-    )
+    # Regex that matches the entire full name (first names + last name)
+    name_pattern = _full_name_pattern(tuple(first_names), last_name)
 
     for idx, line in enumerate(lines):
         if name_pattern.search(line):
@@ -61,8 +126,8 @@ def find_number_below_name(text, first_names, last_name, max_lines_below=3):
             for offset in range(1, max_lines_below + 1):
                 if idx + offset < len(lines):
                     candidate = lines[idx + offset]
-                    # Match whole line if it’s only digits
-                    if re.fullmatch(r"\d+", candidate):
+                    # Match whole line if it’s only digits (isdecimal is exactly regex \d)
+                    if candidate.isdecimal():
                         return candidate
     return None
 
@@ -75,7 +140,8 @@ def extract_name(text, debug=False):
     Steps:
     1. Replace \xa0 with a line break to separate previous page remnants.
     2. Strip and clean lines, removing leading digits that are likely leftover.
-    3. Find greeting line (Dear/Cher/Chère) and extract first names.
+    3. Find greeting line (Dear/Cher/Chère) and extract first names
+       (done in the same pass as step 2, which stops at the greeting).
     4. Search lines above greeting to find full name and deduce last name.
 
     Returns:
@@ -87,34 +153,31 @@ def extract_name(text, debug=False):
 
     # Step 1: split by \xa0 to separate end-of-page artifacts
     text = text.replace('\xa0', '\n')
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    lines = [line for line in map(str.strip, text.splitlines()) if line]
 
     if debug:
         print("[DEBUG:extract_name] Lines after \\xa0 split:")
         for idx, line in enumerate(lines, 1):
             print(f"  Line {idx}: '{line}'")
 
-    # Step 2: remove leading digits from each line (artifacts from previous page)
+    # Steps 2-3 in one pass: remove leading digits from each line (artifacts
+    # from previous page) until the greeting line is found; only the lines
+    # above it are needed afterwards
     cleaned_lines = []
-    for idx, line in enumerate(lines, 1):
-        new_line = re.sub(r'^\d+', '', line).strip()
-        cleaned_lines.append(new_line)
-        if debug and new_line != line:
-            print(f"[DEBUG:extract_name] Cleaned line {idx}: '{line}' -> '{new_line}'")
-
-    lines = cleaned_lines
-
-    # Step 3: find greeting line
     dear_idx = None
     for idx, line in enumerate(lines):
-        match = re.match(r"^(Dear|Cher|Chère)[,]?\s+(.*)", line, flags=re.I)
+        new_line = _LEADING_DIGITS_RE.sub('', line).strip()
+        if debug and new_line != line:
+            print(f"[DEBUG:extract_name] Cleaned line {idx+1}: '{line}' -> '{new_line}'")
+        match = _GREETING_RE.match(new_line)
         if match:
             dear_idx = idx
-            first_names = [fn.strip(string.punctuation) for fn in re.split(r"\s+", match.group(2).strip())]
+            first_names = [fn.strip(string.punctuation) for fn in match.group(2).split()]
             if debug:
-                print(f"[DEBUG:extract_name] Greeting found at line {idx+1}: '{line}'")
+                print(f"[DEBUG:extract_name] Greeting found at line {idx+1}: '{new_line}'")
                 print(f"[DEBUG:extract_name] Extracted first names: {first_names}")
             break
+        cleaned_lines.append(new_line)
 
     if dear_idx is None or not first_names:
         if debug:
@@ -122,12 +185,13 @@ def extract_name(text, debug=False):
         return None, None
 
     # Step 4: search all lines above greeting for full name
-    for line_idx, line in enumerate(reversed(lines[:dear_idx]), 1):
-        found_all = all(re.search(rf"\b{re.escape(fn)}\b", line) for fn in first_names)
+    first_name_patterns = [_word_pattern(fn) for fn in first_names]
+    for line_idx, line in enumerate(reversed(cleaned_lines), 1):
+        found_all = all(pattern.search(line) for pattern in first_name_patterns)
         if found_all:
             temp = line
-            for fn in first_names:
-                temp = re.sub(rf"\b{re.escape(fn)}\b", "", temp, count=1).strip()
+            for pattern in first_name_patterns:
+                temp = pattern.sub("", temp, count=1).strip()
             if temp:
                 last_name = temp
             if debug:
@@ -142,6 +206,139 @@ def extract_name(text, debug=False):
 
 
 
+# -------------------------
+# Splitting
+# -------------------------
+
+def find_segments(pdf, output_subfolder, current_prefix):
+    """
+    First pass of split_pdf(): read the text of every page once and record the
+    page range, output filename, names and CPO flag of each output PDF.
+    """
+    segments = []
+    current = None
+    # Output folder with a trailing separator, joined once for all filenames
+    out_prefix = os.path.join(output_subfolder, "")
+    for i in range(len(pdf)):
+        text = extract_page_text(pdf, i)
+        text_lower = text.lower()
+        # Plain substring tests first: most pages are continuation pages and skip the regexes
+        pn_match = "PN" in text and _PN_RE.search(text)
+        has_cpo = "chief people officer" in text_lower
+
+        # Decide if we need a new PDF (the greeting is only searched when there is no PN)
+        if pn_match or (any(word in text_lower for word in _GREETING_WORDS) and _GREETING_RE.search(text)):
+            # Extract name
+            first_name_str, last_name = extract_name(text)
+            first_name_current = first_name_str if first_name_str else "UNKNOWN"
+            last_name_current = last_name if last_name else "UNKNOWN"
+
+            # Get Person Number (sanitized with the rest of the filename below)
+            if pn_match:
+                person_number_current = pn_match.group(1)
+            else:
+                candidate_pn = find_number_below_name(text, first_name_current.split(), last_name_current)
+                if candidate_pn:
+                    person_number_current = candidate_pn
+                else:
+                    person_number_current = f"PN_NotFound_page_{i+1:04d}"
+
+            # Build filename
+            base_name = f"{current_prefix}_Salary Review_{last_name_current.upper()}_{first_name_current}_{person_number_current}.pdf"
+            current = {
+                "start": i,
+                "end": i + 1,
+                "filename": out_prefix + sanitize_filename(base_name),
+                "first_name": first_name_current,
+                "last_name": last_name_current,
+                "cpo_found": has_cpo
+            }
+            segments.append(current)
+
+        elif current:
+            # Continuation page
+            current["end"] = i + 1
+            if has_cpo:
+                current["cpo_found"] = True
+
+        else:
+            # Fallback if first page doesn't have PN/Dear
+            fallback_name = f"{current_prefix}_Salary Review_UNKNOWN_UNKNOWN_PN_NotFound_page_{i+1:04d}.pdf"
+            current = {
+                "start": i,
+                "end": i + 1,
+                "filename": out_prefix + sanitize_filename(fallback_name),
+                "first_name": "UNKNOWN",
+                "last_name": "UNKNOWN",
+                "cpo_found": has_cpo
+            }
+            segments.append(current)
+
+    return segments
+
+
+def split_pdf(input_pdf, output_subfolder, current_prefix):
+    """
+    Split one input PDF into per-employee PDFs saved in output_subfolder.
+    Runs in a worker process, so it only takes and returns picklable values.
+
+    Returns:
+        saved_files (list): Paths of the PDFs written, in page order
+        missing_cpo_list (list): Summary rows for PDFs without the CPO signature
+        unknown_name_list (list): Summary rows for PDFs with an UNKNOWN name
+    """
+    saved_files = []
+    missing_cpo_list = []
+    unknown_name_list = []
+
+    # One PDFium document serves both passes: text extraction and page copying
+    pdf = pdfium.PdfDocument(input_pdf)
+    try:
+        segments = find_segments(pdf, output_subfolder, current_prefix)
+
+        # Second pass: write each output PDF from its page range in one go
+        for segment in segments:
+            # Another segment or worker may produce the same name: take the next free one
+            filename = claim_filename(segment["filename"])
+            tmp_filename = f"{filename}.{os.getpid()}.tmp"
+            try:
+                out_pdf = pdfium.PdfDocument.new()
+                try:
+                    out_pdf.import_pages(pdf, pages=list(range(segment["start"], segment["end"])))
+                    # Written under a temporary name so the output only ever appears complete
+                    out_pdf.save(tmp_filename)
+                finally:
+                    out_pdf.close()
+                os.replace(tmp_filename, filename)
+            except Exception:
+                # Free the claimed name rather than leave an empty PDF behind
+                for leftover in (tmp_filename, filename):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+                raise
+            saved_files.append(filename)
+
+            # Track missing CPO
+            if not segment["cpo_found"]:
+                missing_cpo_list.append({
+                    "Filename": os.path.basename(filename),
+                    "First Name": segment["first_name"],
+                    "Last Name": segment["last_name"]
+                })
+
+            # Track UNKNOWN names
+            if "UNKNOWN" in segment["first_name"] or "UNKNOWN" in segment["last_name"]:
+                unknown_name_list.append({
+                    "Filename": os.path.basename(filename),
+                    "First Name": segment["first_name"],
+                    "Last Name": segment["last_name"]
+                })
+    finally:
+        pdf.close()
+
+    return saved_files, missing_cpo_list, unknown_name_list
+
+
 # -------------------------
 # GUI Application
 # -------------------------
@@ -152,9 +349,12 @@ class PDFSplitterGUI:
     using extracted names and person numbers.
     """
 
+    GUI_UPDATE_INTERVAL = 0.1  # Seconds between progress redraws (~10 Hz)
+
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("PDF Splitter by Person Number")
+        self.last_progress_update = 0.0
         self.setup_gui()
 
     def setup_gui(self):
@@ -187,8 +387,16 @@ class PDFSplitterGUI:
     def safe_update_gui(self, status=None, detail=None, progress=None):
         """
         Thread-safe way to update the GUI (status, detail, progress bar).
-        Uses `after(0, ...)` to schedule update in Tkinter’s event loop.
+        Uses `after(0, ...)` to schedule update in Tkinter’s event loop,
+        which redraws the widgets itself once the callback returns.
+        Progress updates below 100% are throttled to GUI_UPDATE_INTERVAL.
         """
+        if progress is not None and progress < self.progress["maximum"]:
+            now = time.monotonic()
+            if now - self.last_progress_update < self.GUI_UPDATE_INTERVAL:
+                return
+            self.last_progress_update = now
+
         def update():
             if status is not None:
                 self.status_var.set(status)
@@ -196,7 +404,6 @@ class PDFSplitterGUI:
                 self.detail_var.set(detail)
             if progress is not None:
                 self.progress["value"] = progress
-            self.root.update()
         self.root.after(0, update)
 
     def start_processing(self):
@@ -236,116 +443,41 @@ class PDFSplitterGUI:
             # Collect information for summary GUI
             missing_cpo_list = []
             unknown_name_list = []
-
-            for idx, input_pdf in enumerate(input_pdfs, 1):
-                reader = PdfReader(input_pdf)
-                saved_files = []
-                writer = None
-                current_filename = None
-                cpo_found = False
-                person_number_current = "UNKNOWN"
-                first_name_current = "UNKNOWN"
-                last_name_current = "UNKNOWN"
-
-                for i, page in enumerate(reader.pages):
-                    text = page.extract_text() or ""
-                    has_dear = bool(re.search(r"^(Dear|Cher|Chère)[,]?\s+", text, flags=re.I | re.M))
-                    pn_match = re.search(r"PN[:\s]+(\d+)", text)
-                    has_cpo = "chief people officer" in text.lower()
-
-                    # Decide if we need a new PDF
-                    if pn_match or has_dear:
-                        # Save previous PDF
-                        if writer and current_filename:
-                            with open(current_filename, "wb") as f_out:
-                                writer.write(f_out)
-                            saved_files.append(current_filename)
-
-                            # Track missing CPO
-                            if not cpo_found:
-                                missing_cpo_list.append({
-                                    "Filename": os.path.basename(current_filename),
-                                    "First Name": first_name_current,
-                                    "Last Name": last_name_current
-                                })
-
-                            # Track UNKNOWN names
-                            if "UNKNOWN" in first_name_current or "UNKNOWN" in last_name_current:
-                                unknown_name_list.append({
-                                    "Filename": os.path.basename(current_filename),
-                                    "First Name": first_name_current,
-                                    "Last Name": last_name_current
-                                })
-
-                        # Extract name
-                        first_name_str, last_name = extract_name(text)
-                        first_name_current = first_name_str if first_name_str else "UNKNOWN"
-                        last_name_current = last_name if last_name else "UNKNOWN"
-
-                        # Get Person Number
-                        if pn_match:
-                            person_number_current = sanitize_filename(pn_match.group(1))
-                        else:
-                            candidate_pn = find_number_below_name(text, first_name_current.split(), last_name_current)
-                            if candidate_pn:
-                                person_number_current = sanitize_filename(candidate_pn)
-                            else:
-                                person_number_current = f"PN_NotFound_page_{i+1:04d}"
-
-                        # Build filename
-                        base_name = f"{current_prefix}_Salary Review_{last_name_current.upper()}_{first_name_current}_{person_number_current}.pdf"
-                        current_filename = os.path.join(output_subfolder, sanitize_filename(base_name))
-
-                        # Start new PDF
-                        writer = PdfWriter()
-                        writer.add_page(page)
-                        cpo_found = has_cpo
-
-                    else:
-                        # Continuation page
-                        if writer:
-                            writer.add_page(page)
-                            if has_cpo:
-                                cpo_found = True
-                        else:
-                            # Fallback if first page doesn't have PN/Dear
-                            fallback_name = f"{current_prefix}_Salary Review_UNKNOWN_UNKNOWN_PN_NotFound_page_{i+1:04d}.pdf"
-                            current_filename = os.path.join(output_subfolder, sanitize_filename(fallback_name))
-                            writer = PdfWriter()
-                            writer.add_page(page)
-                            if has_cpo:
-                                cpo_found = True
-
-                # Save last PDF
-                if writer and current_filename:
-                    with open(current_filename, "wb") as f_out:
-                        writer.write(f_out)
-                    saved_files.append(current_filename)
-
-                    # Track missing CPO
-                    if not cpo_found:
-                        missing_cpo_list.append({
-                            "Filename": os.path.basename(current_filename),
-                            "First Name": first_name_current,
-                            "Last Name": last_name_current
-                        })
-
-                    # Track UNKNOWN names
-                    if "UNKNOWN" in first_name_current or "UNKNOWN" in last_name_current:
-                        unknown_name_list.append({
-                            "Filename": os.path.basename(current_filename),
-                            "First Name": first_name_current,
-                            "Last Name": last_name_current
-                        })
-
+            failed_list = []
+
+            # Split the files in parallel; each one is independent and CPU-bound
+            results = [None] * total_files
+            with ProcessPoolExecutor(
+                max_workers=max(1, min(os.cpu_count() or 1, total_files)),
+                mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                futures = {
+                    executor.submit(split_pdf, input_pdf, output_subfolder, current_prefix): i
+                    for i, input_pdf in enumerate(input_pdfs)
+                }
+                for completed, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    # A PDF that cannot be split is reported and skipped, the rest of the batch continues
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        print(f"Failed to split {input_pdfs[i]}:")
+                        traceback.print_exception(type(e), e, e.__traceback__)
+                        failed_list.append({"Filename": os.path.basename(input_pdfs[i]), "Error": str(e)})
+                        results[i] = ([], [], [])
+
+                    # Update GUI progress
+                    self.safe_update_gui(
+                        status=f"Processing {completed}/{total_files}",
+                        detail=f"Current file: {os.path.basename(input_pdfs[i])}",
+                        progress=(completed / total_files) * 100
+                    )
+
+            # Merge in input order so the summary lists files as before
+            for saved_files, missing_cpo, unknown_names in results:
                 all_saved_files.extend(saved_files)
-
-                # Update GUI progress
-                self.safe_update_gui(
-                    status=f"Processing {idx}/{total_files}",
-                    detail=f"Current file: {os.path.basename(input_pdf)}",
-                    progress=(idx / total_files) * 100
-                )
+                missing_cpo_list.extend(missing_cpo)
+                unknown_name_list.extend(unknown_names)
 
             # Display summary GUI
             summary_window = tk.Toplevel(self.root)
@@ -354,14 +486,21 @@ class PDFSplitterGUI:
             summary_text = tk.Text(summary_window, width=100, height=30)
             summary_text.pack(padx=10, pady=10)
 
-            summary_text.insert(tk.END, f"Total PDFs processed: {len(all_saved_files)}\n\n")
-            summary_text.insert(tk.END, f"PDFs missing CPO: {len(missing_cpo_list)}\n")
-            for item in missing_cpo_list:
-                summary_text.insert(tk.END, f"  - {item['Filename']} ({item['First Name']} {item['Last Name']})\n")
+            # Build the whole summary first and insert it into the widget in one call
+            summary_lines = [f"Total PDFs processed: {len(all_saved_files)}\n\n"]
+            summary_lines.append(f"PDFs missing CPO: {len(missing_cpo_list)}\n")
+            summary_lines.extend(
+                f"  - {item['Filename']} ({item['First Name']} {item['Last Name']})\n" for item in missing_cpo_list
+            )
 
-            summary_text.insert(tk.END, f"\nPDFs with UNKNOWN names: {len(unknown_name_list)}\n")
-            for item in unknown_name_list:
-                summary_text.insert(tk.END, f"  - {item['Filename']} ({item['First Name']} {item['Last Name']})\n")
+            summary_lines.append(f"\nPDFs with UNKNOWN names: {len(unknown_name_list)}\n")
+            summary_lines.extend(
+                f"  - {item['Filename']} ({item['First Name']} {item['Last Name']})\n" for item in unknown_name_list
+            )
+            if failed_list:
+                summary_lines.append(f"\nPDFs that could not be split: {len(failed_list)}\n")
+                summary_lines.extend(f"  - {item['Filename']} ({item['Error']})\n" for item in failed_list)
+            summary_text.insert(tk.END, "".join(summary_lines))
 
             summary_text.config(state=tk.DISABLED)
 
@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+import Duplicate_scanned_files_finder as finder
+
+
+def solid_pixmap(rgb, size=4):
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, size, size), False)
+    pix.set_rect(pix.irect, rgb)
+    return pix
+
+
+class PixmapGrayTest(unittest.TestCase):
+    def test_known_colours(self):
+        # (R * 76 + G * 150 + B * 29) >> 8, computed without uint8 overflow
+        cases = {
+            (255, 255, 255): 254,
+            (200, 100, 50): 123,
+            (255, 0, 0): 75,
+            (0, 0, 0): 0,
+        }
+        for rgb, expected in cases.items():
+            gray = finder.pixmap_gray(solid_pixmap(rgb))
+            self.assertEqual(gray.shape, (4, 4))
+            self.assertEqual(gray.dtype.name, "uint8")
+            self.assertTrue((gray == expected).all(), f"{rgb} -> {gray[0, 0]}, expected {expected}")
+
+
+if __name__ == "__main__":
+    unittest.main()